@@ -3,7 +3,10 @@ Google Gemini AI entegrasyonu için servis modülü
 Olay metinlerinden anahtar kelime çıkarma ve karar analizi
 """
 
+import asyncio
+import hashlib
 import google.generativeai as genai
+from cachetools import TTLCache
 from typing import List, Dict, Any
 from loguru import logger
 from .config import settings
@@ -13,6 +16,22 @@ class GeminiAIService:
         """Gemini AI servisini başlatır"""
         genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.5-pro')
+        # Aynı olay metni için tekrar LLM çağrısı yapılmasın (SHA1(case_text) -> keywords)
+        self._keyword_cache = TTLCache(
+            maxsize=settings.KEYWORD_CACHE_MAX_ENTRIES,
+            ttl=settings.KEYWORD_CACHE_TTL
+        )
+        # Tüm istekler aynı sınırı paylaşır; semaphore çalışan event loop'ta oluşturulur
+        self._analysis_semaphore = None
+        self._analysis_semaphore_loop = None
+    
+    def _get_analysis_semaphore(self) -> asyncio.Semaphore:
+        """Karar analizleri için process genelindeki semaphore'u döndürür"""
+        loop = asyncio.get_running_loop()
+        if self._analysis_semaphore_loop is not loop:
+            self._analysis_semaphore = asyncio.Semaphore(settings.AI_ANALYSIS_CONCURRENCY)
+            self._analysis_semaphore_loop = loop
+        return self._analysis_semaphore
         
     async def extract_keywords_from_case(self, case_text: str) -> List[str]:
         """
@@ -24,6 +43,11 @@ class GeminiAIService:
         Returns:
             List[str]: Çıkarılan anahtar kelimeler listesi
         """
+        cache_key = hashlib.sha1(case_text.encode("utf-8"), usedforsecurity=False).digest()
+        cached_keywords = self._keyword_cache.get(cache_key)
+        if cached_keywords is not None:
+            return list(cached_keywords)
+        
         try:
             prompt = f"""
             Aşağıdaki hukuki olay metnini analiz et ve Yargıtay kararlarında arama yapmak için 
@@ -43,6 +67,8 @@ class GeminiAIService:
             keywords = [k for k in keywords if k]  # Boş stringleri filtrele
             
             logger.info(f"Olay metninden {len(keywords)} anahtar kelime çıkarıldı")
+            # Sadece başarılı sonuçlar cache'lenir, fallback değil
+            self._keyword_cache[cache_key] = tuple(keywords)
             return keywords
             
         except Exception as e:
@@ -77,7 +103,10 @@ class GeminiAIService:
             BENZERLIK: [Hangi konularda benzer]
             """
             
-            response = self.model.generate_content(prompt)
+            # Event loop'u bloklamamak için async API kullanılır; böylece analizler paralel çalışabilir.
+            # Eşzamanlı Gemini çağrıları tüm istekler genelinde AI_ANALYSIS_CONCURRENCY ile sınırlı.
+            async with self._get_analysis_semaphore():
+                response = await self.model.generate_content_async(prompt)
             analysis_text = response.text.strip()
             
             # Basit parsing
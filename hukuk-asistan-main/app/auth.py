@@ -7,12 +7,13 @@ from loguru import logger
 
 from .security import (
     verify_password, get_password_hash, create_access_token, 
-    create_refresh_token, get_current_user, TokenData, Token,
+    create_refresh_token, get_current_user, verify_token, TokenData, Token,
     get_client_ip, limiter
 )
 from .firestore_db import firestore_manager
+from .monitoring import MetricsRoute
 
-router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
+router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"], route_class=MetricsRoute)
 
 class UserRegister(BaseModel):
     email: EmailStr
@@ -172,7 +173,6 @@ async def refresh_access_token(refresh_token: str):
     """
     try:
         # Refresh token'ı doğrula
-        from .security import verify_token
         token_data = verify_token(refresh_token)
         
         if not token_data:
@@ -1,3 +1,4 @@
+from functools import cached_property
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 
@@ -7,6 +8,13 @@ class Settings(BaseSettings):
     # Google Gemini AI ayarları
     GEMINI_API_KEY: str
     
+    # Karar analizinde aynı anda yapılacak en fazla Gemini isteği (tüm istekler genelinde)
+    AI_ANALYSIS_CONCURRENCY: int = 8
+    
+    # Anahtar kelime çıkarma sonuç cache'i
+    KEYWORD_CACHE_MAX_ENTRIES: int = 1024
+    KEYWORD_CACHE_TTL: int = 3600  # 1 hour in seconds
+    
     # Yargıtay Scraper API ayarları
     SCRAPER_API_URL: str = "http://localhost:8001"
     
@@ -41,11 +49,11 @@ class Settings(BaseSettings):
     SSL_KEYFILE: str = ""
     SSL_CERTFILE: str = ""
     
-    @property
+    @cached_property
     def is_production(self) -> bool:
         return self.ENVIRONMENT.lower() == "production"
     
-    @property
+    @cached_property
     def cors_origins(self) -> List[str]:
         if self.is_production:
             # Production'da tüm origin'lere izin ver (domain henüz alınmadığı için)
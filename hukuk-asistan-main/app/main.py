@@ -1,7 +1,11 @@
 import sys
+import asyncio
 import httpx
-from fastapi import FastAPI, Request, HTTPException, Depends
+from operator import itemgetter
+import orjson
+from fastapi import FastAPI, Request, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
@@ -21,8 +25,8 @@ from .ai_service import gemini_service
 from .workflow_service import workflow_service
 from .firestore_db import init_firestore_db, firestore_manager, log_api_usage
 from .auth import router as auth_router
-from .monitoring import get_metrics, monitoring_service, HealthChecker
-from .usage_middleware import check_usage_limits
+from .monitoring import get_metrics, monitoring_service, HealthChecker, MetricsRoute
+from .usage_middleware import UsageLimitMiddleware, usage_recorder, get_user_usage_info
 
 # --- Loglama ---
 logger.remove()
@@ -47,14 +51,16 @@ async def lifespan(app: FastAPI):
     )
     app.state.http_client = httpx.AsyncClient(timeout=timeout)
     
-    # Monitoring'i başlat
+    # Monitoring'i ve kullanım kaydını başlat
     monitoring_service.start_monitoring()
+    usage_recorder.start()
     
     logger.info("Yargısal Zeka API'si başlatıldı.")
     yield
     
     # Cleanup
     monitoring_service.stop_monitoring()
+    await usage_recorder.stop()
     await app.state.http_client.aclose()
     # Firestore connection automatically handles cleanup
     logger.info("Yargısal Zeka API'si kapatıldı.")
@@ -64,10 +70,14 @@ app = FastAPI(
     version=settings.API_VERSION,
     description=settings.API_DESCRIPTION + " (MongoDB Atlas)",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if not settings.is_production else None,  # Production'da docs gizle
     redoc_url="/redoc" if not settings.is_production else None
 )
 
+# Request metrics'i route seviyesinde kaydet (ayrı bir timing middleware gerekmez)
+app.router.route_class = MetricsRoute
+
 # Rate limiter'ı app'e ekle
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -75,7 +85,7 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 # CORS middleware ekle - production'da tüm origin'lere izin ver
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"] if settings.is_production else settings.cors_origins,  # Production'da tüm origin'lere izin ver
+    allow_origins=settings.cors_origins,  # Production'da ["*"] döner
     allow_credentials=False if settings.is_production else True,  # Production'da credentials false (wildcard origin ile)
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
@@ -83,9 +93,7 @@ app.add_middleware(
 )
 
 # Usage tracking middleware ekle
-@app.middleware("http")
-async def usage_tracking_middleware(request: Request, call_next):
-    return await check_usage_limits(request, call_next)
+app.add_middleware(UsageLimitMiddleware)
 
 # Auth router'ı ekle
 app.include_router(auth_router)
@@ -101,9 +109,9 @@ async def health_check():
     }
 
 @app.get("/health/detailed")
-async def detailed_health_check():
+async def detailed_health_check(request: Request):
     """Detaylı sağlık kontrolü"""
-    return await HealthChecker.get_comprehensive_health()
+    return await HealthChecker.get_comprehensive_health(request.app.state.http_client)
 
 @app.get("/metrics")
 async def metrics():
@@ -229,7 +237,7 @@ async def smart_search(request: Request, search_request: SmartSearchRequest):
             response = await client.post(scraper_url, json=search_payload, timeout=30.0)
             
             if response.status_code == 200:
-                search_data = response.json()
+                search_data = orjson.loads(response.content)
                 search_results = search_data.get("results", [])
             else:
                 # Scraper API çalışmıyorsa mock data kullan
@@ -239,31 +247,36 @@ async def smart_search(request: Request, search_request: SmartSearchRequest):
             search_results = _get_mock_search_results()
         
         # 3. Her sonucu AI ile analiz et ve puanla
-        analyzed_results = []
-        for result in search_results[:search_request.max_results]:
+        # (Gemini eşzamanlılığı gemini_service içinde process genelinde sınırlı)
+        async def _analyze(result):
             try:
-                analysis = await gemini_service.analyze_decision_relevance(
+                return await gemini_service.analyze_decision_relevance(
                     search_request.case_text, 
                     result.get("content", "")
                 )
             except Exception:
                 # AI analizi başarısızsa fallback puan ver
-                analysis = {
+                return {
                     "score": 75,
                     "explanation": "Otomatik puanlama kullanıldı",
                     "similarity": "Orta"
                 }
-            
-            analyzed_result = {
+        
+        results_to_analyze = search_results[:search_request.max_results]
+        analyses = await asyncio.gather(*(_analyze(result) for result in results_to_analyze))
+        
+        analyzed_results = [
+            {
                 **result,
                 "ai_score": analysis["score"],
                 "ai_explanation": analysis["explanation"],
                 "ai_similarity": analysis["similarity"]
             }
-            analyzed_results.append(analyzed_result)
+            for result, analysis in zip(results_to_analyze, analyses)
+        ]
         
         # Puanına göre sırala (yüksekten düşüğe)
-        analyzed_results.sort(key=lambda x: x.get("ai_score", 0), reverse=True)
+        analyzed_results.sort(key=itemgetter("ai_score"), reverse=True)
         
         return SmartSearchResponse(
             keywords=keywords,
@@ -356,8 +369,6 @@ def _get_mock_search_results():
 async def get_user_usage(request: Request, current_user: TokenData = Depends(get_current_user)):
     """Get current user's usage statistics"""
     try:
-        from .usage_middleware import get_user_usage_info
-        
         user_id = getattr(current_user, 'user_id', None)
         if not user_id:
             raise HTTPException(
@@ -1,13 +1,23 @@
 # monitoring.py - Monitoring ve metrics
 import time
-import psutil
-from typing import Dict, Any
+import httpx
+from typing import Dict, Any, Optional
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from loguru import logger
 import asyncio
 
+from .ai_service import gemini_service
+from .config import settings
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 # Prometheus Metrics
 REQUEST_COUNT = Counter(
     'http_requests_total', 
@@ -61,47 +71,47 @@ CPU_USAGE = Gauge(
     'Process CPU usage percentage'
 )
 
-class MetricsMiddleware:
-    """Prometheus metrics middleware"""
-    
-    def __init__(self, app):
-        self.app = app
+class MetricsRoute(APIRoute):
+    """Prometheus metrics'i route seviyesinde kaydeden APIRoute"""
     
-    async def __call__(self, scope, receive, send):
-        if scope["type"] != "http":
-            await self.app(scope, receive, send)
-            return
-        
-        request = Request(scope, receive)
-        start_time = time.time()
+    def get_route_handler(self):
+        original_route_handler = super().get_route_handler()
+        # Label olarak path template'i kullan (ör. /api/v1/auth/me) - cardinality sınırlı kalır
+        endpoint = self.path
         
-        # Increment active connections
-        ACTIVE_CONNECTIONS.inc()
-        
-        try:
-            response = await self.app(scope, receive, send)
-            return response
-        finally:
-            # Record metrics
-            duration = time.time() - start_time
-            method = request.method
-            path = request.url.path
-            
-            # Get status code from response (this is tricky in ASGI)
-            status_code = getattr(request.state, 'status_code', 200)
-            
-            REQUEST_COUNT.labels(
-                method=method,
-                endpoint=path,
-                status_code=status_code
-            ).inc()
-            
-            REQUEST_DURATION.labels(
-                method=method,
-                endpoint=path
-            ).observe(duration)
+        async def custom_route_handler(request: Request) -> Response:
+            start_time = time.time()
+            status_code = 500
+            ACTIVE_CONNECTIONS.inc()
             
-            ACTIVE_CONNECTIONS.dec()
+            try:
+                response = await original_route_handler(request)
+                status_code = response.status_code
+                return response
+            except StarletteHTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                # Doğrulama hatası route handler içinde atılır, exception handler'da 422'ye çevrilir
+                status_code = 422
+                raise
+            finally:
+                duration = time.time() - start_time
+                
+                REQUEST_COUNT.labels(
+                    method=request.method,
+                    endpoint=endpoint,
+                    status_code=status_code
+                ).inc()
+                
+                REQUEST_DURATION.labels(
+                    method=request.method,
+                    endpoint=endpoint
+                ).observe(duration)
+                
+                ACTIVE_CONNECTIONS.dec()
+        
+        return custom_route_handler
 
 class MonitoringService:
     """Monitoring service for collecting system metrics"""
@@ -109,9 +119,17 @@ class MonitoringService:
     def __init__(self):
         self.start_time = time.time()
         self._monitoring_task = None
+        # cpu_percent(interval=None) bir önceki çağrıya göre ölçer; aynı Process
+        # nesnesini saklayıp bir kez çağırarak sonraki ölçümleri anlamlı ve bloklamasız yap
+        self._process = psutil.Process() if psutil else None
+        if self._process:
+            self._process.cpu_percent(interval=None)
     
     def start_monitoring(self):
         """Start background monitoring task"""
+        if self._process is None:
+            logger.warning("psutil bulunamadı - sistem metrikleri toplanmayacak")
+            return
         if self._monitoring_task is None:
             self._monitoring_task = asyncio.create_task(self._collect_system_metrics())
     
@@ -126,11 +144,11 @@ class MonitoringService:
         while True:
             try:
                 # Memory usage
-                memory_info = psutil.Process().memory_info()
+                memory_info = self._process.memory_info()
                 MEMORY_USAGE.set(memory_info.rss)
                 
                 # CPU usage
-                cpu_percent = psutil.Process().cpu_percent()
+                cpu_percent = self._process.cpu_percent(interval=None)
                 CPU_USAGE.set(cpu_percent)
                 
                 # Wait 30 seconds before next collection
@@ -158,15 +176,18 @@ class MonitoringService:
     def get_health_status(self) -> Dict[str, Any]:
         """Get current health status"""
         uptime = time.time() - self.start_time
-        memory_info = psutil.Process().memory_info()
-        
-        return {
+        health_status = {
             "status": "healthy",
             "uptime_seconds": uptime,
-            "memory_usage_mb": memory_info.rss / 1024 / 1024,
-            "cpu_usage_percent": psutil.Process().cpu_percent(),
             "timestamp": time.time()
         }
+        
+        if self._process:
+            memory_info = self._process.memory_info()
+            health_status["memory_usage_mb"] = memory_info.rss / 1024 / 1024
+            health_status["cpu_usage_percent"] = self._process.cpu_percent(interval=None)
+        
+        return health_status
 
 # Global monitoring service instance
 monitoring_service = MonitoringService()
@@ -216,6 +237,12 @@ def log_performance(operation: str):
 class HealthChecker:
     """Health check service"""
     
+    # Aynı anda gelen probe'lar tek bir backend kontrolünü paylaşsın
+    CACHE_TTL_SECONDS = 3.0
+    _cached_health: Optional[Dict[str, Any]] = None
+    _cached_at: float = 0.0
+    _lock = asyncio.Lock()
+    
     @staticmethod
     async def check_database_health() -> Dict[str, Any]:
         """Check Firestore connectivity"""
@@ -231,13 +258,13 @@ class HealthChecker:
     
     @staticmethod
     async def check_ai_service_health() -> Dict[str, Any]:
-        """Check AI service connectivity"""
+        """Check AI service configuration (Gemini'ye istek atmadan)"""
         try:
-            # Mock AI service health check
+            # Her probe'da LLM çağrısı yapmak yerine yerel yapılandırmayı kontrol et
+            available = bool(settings.GEMINI_API_KEY) and getattr(gemini_service, "model", None) is not None
             return {
-                "status": "healthy",
-                "response_time_ms": 50,
-                "available": True
+                "status": "healthy" if available else "unhealthy",
+                "available": available
             }
         except Exception as e:
             return {
@@ -247,13 +274,24 @@ class HealthChecker:
             }
     
     @staticmethod
-    async def check_external_services_health() -> Dict[str, Any]:
+    async def check_external_services_health(http_client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
         """Check external services (scraper, etc.)"""
         try:
-            # Mock external service health check
+            health_url = f"{settings.SCRAPER_API_URL.rstrip('/')}/health"
+            
+            start_time = time.time()
+            if http_client is None:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.get(health_url)
+            else:
+                # Lifespan'de oluşturulan paylaşımlı client keep-alive bağlantılarını yeniden kullanır
+                response = await http_client.get(health_url, timeout=5.0)
+            response_time_ms = (time.time() - start_time) * 1000
+            
+            scraper_status = "healthy" if response.status_code == 200 else "unhealthy"
             return {
-                "scraper_api": {"status": "healthy", "response_time_ms": 30},
-                "selenium_hub": {"status": "healthy", "response_time_ms": 20}
+                "status": scraper_status,
+                "scraper_api": {"status": scraper_status, "response_time_ms": round(response_time_ms, 2)}
             }
         except Exception as e:
             return {
@@ -262,19 +300,39 @@ class HealthChecker:
             }
     
     @classmethod
-    async def get_comprehensive_health(cls) -> Dict[str, Any]:
-        """Get comprehensive health status"""
+    async def get_comprehensive_health(cls, http_client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+        """Get comprehensive health status (kısa süreli cache ile)"""
+        if cls._cached_health is not None and time.monotonic() - cls._cached_at < cls.CACHE_TTL_SECONDS:
+            return cls._cached_health
+        
+        async with cls._lock:
+            # Lock beklerken başka bir istek cache'i yenilemiş olabilir
+            if cls._cached_health is not None and time.monotonic() - cls._cached_at < cls.CACHE_TTL_SECONDS:
+                return cls._cached_health
+            
+            cls._cached_health = await cls._run_health_checks(http_client)
+            cls._cached_at = time.monotonic()
+            return cls._cached_health
+    
+    @classmethod
+    async def _run_health_checks(cls, http_client: Optional[httpx.AsyncClient] = None) -> Dict[str, Any]:
+        """Run all health checks concurrently"""
         health_checks = await asyncio.gather(
             cls.check_database_health(),
             cls.check_ai_service_health(),
-            cls.check_external_services_health(),
+            cls.check_external_services_health(http_client),
             return_exceptions=True
         )
         
+        # Exception dönen kontroller de unhealthy sayılsın
+        health_checks = [
+            {"status": "unhealthy", "error": str(check)} if isinstance(check, BaseException) else check
+            for check in health_checks
+        ]
         database_health, ai_health, external_health = health_checks
         
         overall_status = "healthy"
-        if any(check.get("status") == "unhealthy" for check in health_checks if isinstance(check, dict)):
+        if any(check.get("status") == "unhealthy" for check in health_checks):
             overall_status = "degraded"
         
         return {
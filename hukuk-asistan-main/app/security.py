@@ -1,10 +1,12 @@
 # security.py - Güvenlik modülü
 import os
+import re
 import jwt
 import bcrypt
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from urllib.parse import urlparse
 from fastapi import HTTPException, Depends, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -22,6 +24,10 @@ REFRESH_TOKEN_EXPIRE_DAYS = 7
 # Rate Limiter
 limiter = Limiter(key_func=get_remote_address)
 
+# XSS ve injection koruması için yasaklı kalıplar (tek seferde derlenir)
+DANGEROUS_PATTERNS = ['<script', 'javascript:', 'onload=', 'onerror=', 'DROP TABLE', 'DELETE FROM']
+_DANGEROUS_PATTERN_RE = re.compile("|".join(map(re.escape, DANGEROUS_PATTERNS)), re.IGNORECASE)
+
 # Security Bearer
 security = HTTPBearer()
 
@@ -118,16 +124,17 @@ async def get_admin_user(current_user: TokenData = Depends(get_current_user)) ->
         )
     return current_user
 
+# Abonelik planlarına göre işlem limitleri (-1 means unlimited)
+SUBSCRIPTION_LIMITS = {
+    "basic": {"search": 50, "ai_analysis": 20, "petition": 5},
+    "standard": {"search": 500, "ai_analysis": 200, "petition": 50},
+    "premium": {"search": -1, "ai_analysis": -1, "petition": -1},  # Unlimited
+    "admin": {"search": -1, "ai_analysis": -1, "petition": -1}
+}
+
 def check_subscription_limits(user: TokenData, operation: str = "search") -> bool:
     """Abonelik limitleri kontrolü"""
-    limits = {
-        "basic": {"search": 50, "ai_analysis": 20, "petition": 5},
-        "standard": {"search": 500, "ai_analysis": 200, "petition": 50},
-        "premium": {"search": -1, "ai_analysis": -1, "petition": -1},  # Unlimited
-        "admin": {"search": -1, "ai_analysis": -1, "petition": -1}
-    }
-    
-    user_limits = limits.get(user.subscription_plan, limits["basic"])
+    user_limits = SUBSCRIPTION_LIMITS.get(user.subscription_plan, SUBSCRIPTION_LIMITS["basic"])
     operation_limit = user_limits.get(operation, 0)
     
     # -1 means unlimited
@@ -140,14 +147,13 @@ def check_subscription_limits(user: TokenData, operation: str = "search") -> boo
 
 def validate_input(text: str, max_length: int = 10000, min_length: int = 10) -> str:
     """Input validasyonu"""
-    if not text or not text.strip():
+    text = text.strip() if text else ""
+    if not text:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Metin boş olamaz"
         )
     
-    text = text.strip()
-    
     if len(text) < min_length:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -161,15 +167,11 @@ def validate_input(text: str, max_length: int = 10000, min_length: int = 10) ->
         )
     
     # XSS ve injection koruması
-    dangerous_patterns = ['<script', 'javascript:', 'onload=', 'onerror=', 'DROP TABLE', 'DELETE FROM']
-    text_lower = text.lower()
-    
-    for pattern in dangerous_patterns:
-        if pattern.lower() in text_lower:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Güvenlik nedeniyle bu metin kabul edilemez"
-            )
+    if _DANGEROUS_PATTERN_RE.search(text):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Güvenlik nedeniyle bu metin kabul edilemez"
+        )
     
     return text
 
@@ -186,20 +188,21 @@ def get_client_ip(request: Request) -> str:
     
     return request.client.host
 
+DEFAULT_REDIRECT_HOSTS = frozenset({"localhost", "127.0.0.1", "yargisalzeka.com"})
+
 def is_safe_redirect_url(url: str, allowed_hosts: list = None) -> bool:
     """Güvenli redirect URL kontrolü"""
     if not url:
         return False
     
     if allowed_hosts is None:
-        allowed_hosts = ["localhost", "127.0.0.1", "yargisalzeka.com"]
+        allowed_hosts = DEFAULT_REDIRECT_HOSTS
     
     # Relative URL'ler güvenli
     if url.startswith("/") and not url.startswith("//"):
         return True
     
     # Absolute URL'leri kontrol et
-    from urllib.parse import urlparse
     try:
         parsed = urlparse(url)
         return parsed.hostname in allowed_hosts
@@ -209,8 +212,9 @@ def is_safe_redirect_url(url: str, allowed_hosts: list = None) -> bool:
 # API Key authentication (alternatif)
 class APIKeyAuth:
     def __init__(self):
-        self.api_keys = os.getenv("API_KEYS", "").split(",")
-        self.api_keys = [key.strip() for key in self.api_keys if key.strip()]
+        api_keys = os.getenv("API_KEYS", "").split(",")
+        # Her istekte O(1) üyelik kontrolü için set olarak tut
+        self.api_keys = frozenset(key.strip() for key in api_keys if key.strip())
     
     def __call__(self, request: Request) -> bool:
         api_key = request.headers.get("X-API-Key")
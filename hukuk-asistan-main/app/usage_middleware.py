@@ -1,50 +1,117 @@
 """
 Usage tracking middleware for API endpoints
 """
-from fastapi import Request, HTTPException, status
+from fastapi import status
 from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
 from .firestore_db import firestore_manager
-from .security import get_current_user
+from .security import verify_token
 from loguru import logger
+from typing import Optional
+import asyncio
 import time
 
-async def check_usage_limits(request: Request, call_next):
-    """Middleware to check usage limits for protected endpoints"""
+
+class UsageRecorder:
+    """Kullanım sayaçlarını istek yolunun dışında, arka planda günceller"""
+    
+    MAX_QUEUE_SIZE = 10_000
+    DRAIN_TIMEOUT_SECONDS = 5.0
+    
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task = None
+    
+    def start(self):
+        """Start background consumer task"""
+        if self._worker_task is None:
+            # Kuyruk çalışan event loop'ta oluşturulur; her lifespan kendi kuyruğunu kullanır
+            self._queue = asyncio.Queue(maxsize=self.MAX_QUEUE_SIZE)
+            self._worker_task = asyncio.create_task(self._consume())
+    
+    async def stop(self):
+        """Drain pending records and stop the consumer task"""
+        if self._worker_task is None:
+            return
+        
+        # Consumer ölmüşse ya da Firestore yanıt vermiyorsa kapanış sonsuza dek beklemesin
+        if not self._worker_task.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.DRAIN_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning("Usage queue boşaltılamadı, {} kayıt atlandı", self._queue.qsize())
+        
+        self._worker_task.cancel()
+        try:
+            await self._worker_task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("Usage consumer error: {}", e)
+        self._worker_task = None
+        self._queue = None
+    
+    def record(self, user_id: str):
+        """Kullanımı kuyruğa ekle; kuyruk doluysa kaydı düşür"""
+        if self._queue is None:
+            logger.warning("Usage recorder başlatılmadı, kullanım kaydı atlandı: {}", user_id)
+            return
+        try:
+            self._queue.put_nowait(user_id)
+        except asyncio.QueueFull:
+            logger.warning("Usage queue dolu, kullanım kaydı atlandı: {}", user_id)
+    
+    async def _consume(self):
+        while True:
+            user_id = await self._queue.get()
+            try:
+                await firestore_manager.increment_user_search_usage(user_id)
+            except Exception as e:
+                logger.error("Usage increment error: {}", e)
+            finally:
+                self._queue.task_done()
+
+
+# Global usage recorder instance
+usage_recorder = UsageRecorder()
+
+class UsageLimitMiddleware:
+    """Pure ASGI middleware to check usage limits for protected endpoints"""
     
     # Skip usage check for auth endpoints and health checks
-    skip_paths = ['/api/v1/auth/', '/health', '/docs', '/openapi.json']
-    if any(request.url.path.startswith(path) for path in skip_paths):
-        response = await call_next(request)
-        return response
+    SKIP_PATHS = ('/api/v1/auth/', '/health', '/docs', '/openapi.json')
+    # Only search endpoints are counted
+    SEARCH_PATHS = ('/api/v1/ai/', '/api/v1/workflow/')
     
-    # Skip for non-search endpoints
-    search_endpoints = ['/api/v1/ai/', '/api/v1/workflow/']
-    if not any(request.url.path.startswith(path) for path in search_endpoints):
-        response = await call_next(request)
-        return response
+    def __init__(self, app):
+        self.app = app
     
-    try:
-        # Get user from authorization header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            # If no auth, let the endpoint handle it
-            response = await call_next(request)
-            return response
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        token = auth_header.split(' ')[1]
-        user_data = await get_current_user(token)
-        user_id = user_data.get('id')
+        path = scope["path"]
+        if path.startswith(self.SKIP_PATHS) or not path.startswith(self.SEARCH_PATHS):
+            await self.app(scope, receive, send)
+            return
         
-        if not user_id:
-            response = await call_next(request)
-            return response
+        try:
+            user_id = await self._get_user_id(scope)
+            usage_check = await firestore_manager.check_user_search_limit(user_id) if user_id else None
+        except Exception as e:
+            logger.error("Usage middleware error: {}", e)
+            # If middleware fails, let the request continue
+            user_id = None
         
-        # Check usage limits
-        usage_check = await firestore_manager.check_user_search_limit(user_id)
+        if not user_id:
+            # If no auth, let the endpoint handle it
+            await self.app(scope, receive, send)
+            return
         
         if not usage_check.get('can_search', False):
             reason = usage_check.get('reason', 'Usage limit exceeded')
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={
                     "detail": f"Arama limiti aşıldı: {reason}",
@@ -52,26 +119,41 @@ async def check_usage_limits(request: Request, call_next):
                     "reason": reason
                 }
             )
+            await response(scope, receive, send)
+            return
+        
+        # Process the request, capturing the status code from the response start message
+        status_code = None
+        
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
-        # Process the request
         start_time = time.time()
-        response = await call_next(request)
+        await self.app(scope, receive, send_wrapper)
         
-        # If request was successful, increment usage
-        if response.status_code == 200:
-            await firestore_manager.increment_user_search_usage(user_id)
+        # If request was successful, increment usage (Firestore yazımı arka planda yapılır)
+        if status_code == 200:
+            usage_recorder.record(user_id)
             
             # Log the usage
             processing_time = time.time() - start_time
-            logger.info(f"API usage logged for user {user_id}: {request.url.path} - {processing_time:.2f}s")
-        
-        return response
+            # loguru formatlamayı seviye filtresinden sonra yapar; f-string her istekte oluşturulmasın
+            logger.info("API usage logged for user {}: {} - {:.2f}s", user_id, path, processing_time)
+    
+    @staticmethod
+    async def _get_user_id(scope):
+        """Get user id from the authorization header"""
+        auth_header = Headers(scope=scope).get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return None
         
-    except Exception as e:
-        logger.error(f"Usage middleware error: {e}")
-        # If middleware fails, let the request continue
-        response = await call_next(request)
-        return response
+        token = auth_header.split(' ')[1]
+        # get_current_user bir FastAPI dependency'si; middleware'de token doğrudan doğrulanır
+        token_data = verify_token(token)
+        return token_data.user_id if token_data else None
 
 async def get_user_usage_info(user_id: str) -> dict:
     """Get user's current usage information"""
@@ -86,7 +168,7 @@ async def get_user_usage_info(user_id: str) -> dict:
             "plan": usage_check.get('plan', 'free')
         }
     except Exception as e:
-        logger.error(f"Error getting user usage info: {e}")
+        logger.error("Error getting user usage info: {}", e)
         # Return default values if there's an error
         return {
             "usage_stats": {
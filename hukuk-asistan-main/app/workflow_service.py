@@ -5,6 +5,8 @@ n8n workflow'larının yerini alan mikroservisler
 
 import time
 import httpx
+from operator import itemgetter
+import orjson
 from loguru import logger
 from typing import List, Dict, Any, Optional
 
@@ -12,6 +14,15 @@ from .ai_service import gemini_service
 from .config import settings
 
 
+# Fallback keyword extraction için hukuki terimler (küçük harfli, modül yüklenirken bir kez oluşturulur)
+LEGAL_TERMS = (
+    "sözleşme", "tazminat", "zarar", "yükümlülük", "hak", "borç",
+    "satış", "kira", "iş", "hizmet", "ürün", "teslim", "ödeme",
+    "mahkeme", "dava", "karar", "temyiz", "istinaf", "icra",
+    "mülkiyet", "zilyetlik", "rehin", "kefalet", "garanti"
+)
+
+
 class WorkflowService:
     """
     n8n workflow'larının yerini alan mikroservis sınıfı
@@ -96,19 +107,8 @@ class WorkflowService:
     def _generate_fallback_keywords(self, case_text: str) -> List[str]:
         """Gemini API çalışmadığında kullanılacak basit keyword extraction"""
         # Basit keyword extraction - hukuki terimler
-        legal_terms = [
-            "sözleşme", "tazminat", "zarar", "yükümlülük", "hak", "borç",
-            "satış", "kira", "iş", "hizmet", "ürün", "teslim", "ödeme",
-            "mahkeme", "dava", "karar", "temyiz", "istinaf", "icra",
-            "mülkiyet", "zilyetlik", "rehin", "kefalet", "garanti"
-        ]
-        
         case_lower = case_text.lower()
-        found_keywords = []
-        
-        for term in legal_terms:
-            if term in case_lower:
-                found_keywords.append(term)
+        found_keywords = [term for term in LEGAL_TERMS if term in case_lower]
         
         # En az 3, en fazla 8 keyword döndür
         if len(found_keywords) < 3:
@@ -148,7 +148,7 @@ class WorkflowService:
             response = await client.post(scraper_url, json=search_payload)
             
             if response.status_code == 200:
-                search_data = response.json()
+                search_data = orjson.loads(response.content)
                 return search_data.get("results", [])
             else:
                 logger.warning(f"Scraper API hatası: {response.status_code}")
@@ -225,7 +225,7 @@ class WorkflowService:
             analyzed_results.append(analyzed_result)
         
         # Puanına göre sırala (yüksekten düşüğe)
-        analyzed_results.sort(key=lambda x: x.get("ai_score", 0), reverse=True)
+        analyzed_results.sort(key=itemgetter("ai_score"), reverse=True)
         
         return analyzed_results
     
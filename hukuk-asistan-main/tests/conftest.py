@@ -12,10 +12,11 @@ def event_loop():
     yield loop
     loop.close()
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Test client for synchronous tests"""
-    return TestClient(app)
+    """Test client for synchronous tests (lifespan is started once per session)"""
+    with TestClient(app) as test_client:
+        yield test_client
 
 @pytest.fixture
 async def async_client():
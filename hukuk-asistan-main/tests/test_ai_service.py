@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from types import SimpleNamespace
+from cachetools import TTLCache
+
+from app.ai_service import gemini_service
+from app.config import settings
+
+
+class FakeModel:
+    """Gemini modeli yerine çağrıları sayan sahte model"""
+
+    def __init__(self, text="tazminat, sözleşme ihlali", fail=False):
+        self.text = text
+        self.fail = fail
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("Gemini erişilemiyor")
+        return SimpleNamespace(text=self.text)
+
+
+@pytest.fixture
+def keyword_cache(monkeypatch):
+    cache = TTLCache(maxsize=16, ttl=60)
+    monkeypatch.setattr(gemini_service, "_keyword_cache", cache)
+    return cache
+
+
+class TestKeywordCache:
+    """Keyword extraction cache tests"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_model(self, monkeypatch, keyword_cache, sample_case_text):
+        """Test the same case text is answered from the cache"""
+        model = FakeModel()
+        monkeypatch.setattr(gemini_service, "model", model)
+
+        first = await gemini_service.extract_keywords_from_case(sample_case_text)
+        second = await gemini_service.extract_keywords_from_case(sample_case_text)
+
+        assert first == second == ["tazminat", "sözleşme ihlali"]
+        assert model.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_fallback_is_not_cached(self, monkeypatch, keyword_cache, sample_case_text):
+        """Test the fallback keywords are not stored on model errors"""
+        monkeypatch.setattr(gemini_service, "model", FakeModel(fail=True))
+        fallback = await gemini_service.extract_keywords_from_case(sample_case_text)
+        assert fallback == ["tazminat", "hukuki sorumluluk"]
+        assert len(keyword_cache) == 0
+
+        model = FakeModel()
+        monkeypatch.setattr(gemini_service, "model", model)
+        keywords = await gemini_service.extract_keywords_from_case(sample_case_text)
+
+        assert keywords == ["tazminat", "sözleşme ihlali"]
+        assert model.calls == 1
+
+
+class ConcurrencyTrackingModel:
+    """Aynı anda kaç analiz çağrısı yapıldığını ölçen sahte model"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_content_async(self, prompt):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return SimpleNamespace(text="PUAN: 80\nAÇIKLAMA: Benzer\nBENZERLIK: Tazminat")
+
+
+class TestDecisionAnalysis:
+    """Decision analysis tests"""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_shared_across_calls(self, monkeypatch):
+        """Test separate callers share one AI_ANALYSIS_CONCURRENCY limit"""
+        model = ConcurrencyTrackingModel()
+        monkeypatch.setattr(gemini_service, "model", model)
+        monkeypatch.setattr(settings, "AI_ANALYSIS_CONCURRENCY", 2)
+        monkeypatch.setattr(gemini_service, "_analysis_semaphore_loop", None)
+
+        # İki ayrı "istek", her biri üç karar analiz ediyor
+        async def analyze_batch():
+            return await asyncio.gather(*(
+                gemini_service.analyze_decision_relevance("olay", "karar") for _ in range(3)
+            ))
+
+        batches = await asyncio.gather(analyze_batch(), analyze_batch())
+
+        assert model.max_active == 2
+        assert all(analysis["score"] == 80 for batch in batches for analysis in batch)
@@ -1,13 +1,9 @@
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
-
-client = TestClient(app)
 
 class TestAPIEndpoints:
     """API endpoint tests"""
 
-    def test_health_check(self):
+    def test_health_check(self, client):
         """Test health check endpoint"""
         response = client.get("/health")
         assert response.status_code == 200
@@ -16,7 +12,7 @@ class TestAPIEndpoints:
         assert "service" in data
         assert "version" in data
 
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test root endpoint"""
         response = client.get("/")
         assert response.status_code == 200
@@ -25,14 +21,14 @@ class TestAPIEndpoints:
         assert "version" in data
         assert "docs" in data
 
-    def test_extract_keywords_without_auth(self):
+    def test_extract_keywords_without_auth(self, client):
         """Test keyword extraction without authentication"""
         response = client.post("/api/v1/ai/extract-keywords", json={
             "case_text": "Test case text"
         })
         assert response.status_code == 401
 
-    def test_extract_keywords_with_auth(self, auth_headers, sample_case_text):
+    def test_extract_keywords_with_auth(self, client, auth_headers, sample_case_text):
         """Test keyword extraction with authentication"""
         response = client.post(
             "/api/v1/ai/extract-keywords",
@@ -43,7 +39,7 @@ class TestAPIEndpoints:
         # In a real test environment, we'd mock the AI service
         assert response.status_code in [200, 500]  # 500 if AI service unavailable
 
-    def test_extract_keywords_invalid_input(self, auth_headers):
+    def test_extract_keywords_invalid_input(self, client, auth_headers):
         """Test keyword extraction with invalid input"""
         response = client.post(
             "/api/v1/ai/extract-keywords",
@@ -53,7 +49,7 @@ class TestAPIEndpoints:
         assert response.status_code == 400
         assert "boş olamaz" in response.json()["detail"]
 
-    def test_extract_keywords_xss_input(self, auth_headers):
+    def test_extract_keywords_xss_input(self, client, auth_headers):
         """Test keyword extraction with XSS attempt"""
         malicious_text = "Legal text <script>alert('xss')</script> more text"
         response = client.post(
@@ -64,7 +60,7 @@ class TestAPIEndpoints:
         assert response.status_code == 400
         assert "güvenlik" in response.json()["detail"].lower()
 
-    def test_rate_limiting(self, auth_headers, sample_case_text):
+    def test_rate_limiting(self, client, auth_headers, sample_case_text):
         """Test rate limiting on API endpoints"""
         # Make multiple requests to trigger rate limiting
         # Note: This test might be flaky depending on timing
@@ -83,7 +79,7 @@ class TestAPIEndpoints:
 class TestCORS:
     """CORS configuration tests"""
 
-    def test_cors_headers(self):
+    def test_cors_headers(self, client):
         """Test CORS headers are present"""
         response = client.options("/api/v1/auth/login")
         assert response.status_code == 200
@@ -97,12 +93,12 @@ class TestCORS:
 class TestErrorHandling:
     """Error handling tests"""
 
-    def test_404_endpoint(self):
+    def test_404_endpoint(self, client):
         """Test 404 for non-existent endpoint"""
         response = client.get("/nonexistent")
         assert response.status_code == 404
 
-    def test_method_not_allowed(self):
+    def test_method_not_allowed(self, client):
         """Test 405 for wrong HTTP method"""
         response = client.get("/api/v1/auth/login")  # Should be POST
         assert response.status_code == 405
\ No newline at end of file
@@ -1,13 +1,9 @@
 import pytest
-from fastapi.testclient import TestClient
-from app.main import app
-
-client = TestClient(app)
 
 class TestAuthentication:
     """Authentication endpoint tests"""
 
-    def test_register_user_success(self):
+    def test_register_user_success(self, client):
         """Test successful user registration"""
         user_data = {
             "email": "newuser@example.com",
@@ -20,7 +16,7 @@ class TestAuthentication:
         assert data["status"] == "success"
         assert data["email"] == user_data["email"]
 
-    def test_register_user_weak_password(self):
+    def test_register_user_weak_password(self, client):
         """Test registration with weak password"""
         user_data = {
             "email": "test@example.com",
@@ -31,7 +27,7 @@ class TestAuthentication:
         assert response.status_code == 400
         assert "en az 8 karakter" in response.json()["detail"]
 
-    def test_login_success(self):
+    def test_login_success(self, client):
         """Test successful login with demo credentials"""
         login_data = {
             "email": "demo@yargisalzeka.com",
@@ -44,7 +40,7 @@ class TestAuthentication:
         assert "refresh_token" in data
         assert data["token_type"] == "bearer"
 
-    def test_login_invalid_credentials(self):
+    def test_login_invalid_credentials(self, client):
         """Test login with invalid credentials"""
         login_data = {
             "email": "wrong@example.com",
@@ -54,12 +50,12 @@ class TestAuthentication:
         assert response.status_code == 401
         assert "Email veya şifre hatalı" in response.json()["detail"]
 
-    def test_get_current_user_without_token(self):
+    def test_get_current_user_without_token(self, client):
         """Test accessing protected endpoint without token"""
         response = client.get("/api/v1/auth/me")
         assert response.status_code == 401
 
-    def test_get_current_user_with_valid_token(self, auth_headers):
+    def test_get_current_user_with_valid_token(self, client, auth_headers):
         """Test accessing protected endpoint with valid token"""
         response = client.get("/api/v1/auth/me", headers=auth_headers)
         assert response.status_code == 200
@@ -67,7 +63,7 @@ class TestAuthentication:
         assert "email" in data
         assert "subscription_plan" in data
 
-    def test_logout_success(self, auth_headers):
+    def test_logout_success(self, client, auth_headers):
         """Test successful logout"""
         response = client.post("/api/v1/auth/logout", headers=auth_headers)
         assert response.status_code == 200
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.monitoring import MetricsRoute, HealthChecker
+
+
+def create_test_app():
+    """MetricsRoute kullanan tek endpoint'li uygulama"""
+    test_app = FastAPI()
+    test_app.router.route_class = MetricsRoute
+
+    @test_app.get("/metrics-test/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    return test_app
+
+
+def request_count(method, endpoint, status_code):
+    value = REGISTRY.get_sample_value(
+        "http_requests_total",
+        {"method": method, "endpoint": endpoint, "status_code": str(status_code)}
+    )
+    return value or 0.0
+
+
+class TestMetricsRoute:
+    """Metrics route tests"""
+
+    def test_request_count_labels(self):
+        """Test 200 and 422 responses are counted with their own status codes"""
+        endpoint = "/metrics-test/{item_id}"
+        before_ok = request_count("GET", endpoint, 200)
+        before_invalid = request_count("GET", endpoint, 422)
+        before_error = request_count("GET", endpoint, 500)
+
+        with TestClient(create_test_app()) as test_client:
+            assert test_client.get("/metrics-test/1").status_code == 200
+            assert test_client.get("/metrics-test/abc").status_code == 422
+
+        assert request_count("GET", endpoint, 200) == before_ok + 1
+        assert request_count("GET", endpoint, 422) == before_invalid + 1
+        assert request_count("GET", endpoint, 500) == before_error
+
+
+class TestHealthChecker:
+    """Health checker cache tests"""
+
+    @pytest.mark.asyncio
+    async def test_health_is_cached_within_ttl(self, monkeypatch):
+        """Test calls within CACHE_TTL_SECONDS share one round of checks"""
+        calls = []
+
+        async def fake_run_health_checks(http_client=None):
+            calls.append(http_client)
+            await asyncio.sleep(0.01)
+            return {"status": "healthy"}
+
+        monkeypatch.setattr(HealthChecker, "_run_health_checks", fake_run_health_checks)
+        monkeypatch.setattr(HealthChecker, "_cached_health", None)
+        monkeypatch.setattr(HealthChecker, "_lock", asyncio.Lock())
+
+        # Eşzamanlı iki probe ve ardından gelen bir probe aynı sonucu paylaşır
+        first, second = await asyncio.gather(
+            HealthChecker.get_comprehensive_health(),
+            HealthChecker.get_comprehensive_health()
+        )
+        third = await HealthChecker.get_comprehensive_health()
+
+        assert len(calls) == 1
+        assert first == second == third == {"status": "healthy"}
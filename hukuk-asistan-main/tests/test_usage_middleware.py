@@ -0,0 +1,117 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import call, create_autospec
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import usage_middleware
+from app.firestore_db import FirestoreManager
+from app.usage_middleware import UsageLimitMiddleware, UsageRecorder
+
+LIMIT_REACHED = {"can_search": False, "reason": "Trial search limit reached"}
+
+
+def create_test_app(recorder):
+    """Sadece UsageLimitMiddleware ve sahte endpoint'ler içeren uygulama"""
+    @asynccontextmanager
+    async def lifespan(app):
+        recorder.start()
+        yield
+        await recorder.stop()
+
+    test_app = FastAPI(lifespan=lifespan)
+    test_app.add_middleware(UsageLimitMiddleware)
+
+    @test_app.post("/api/v1/ai/extract-keywords")
+    async def extract_keywords():
+        return {"keywords": ["tazminat"]}
+
+    @test_app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return test_app
+
+
+@pytest.fixture
+def fake_firestore(monkeypatch):
+    # autospec: gerçek FirestoreManager'da olmayan bir metot çağrılırsa test başarısız olur
+    fake = create_autospec(FirestoreManager, instance=True)
+    fake.check_user_search_limit.return_value = {"can_search": True, "remaining_searches": 5}
+    fake.increment_user_search_usage.return_value = True
+    monkeypatch.setattr(usage_middleware, "firestore_manager", fake)
+    return fake
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = UsageRecorder()
+    monkeypatch.setattr(usage_middleware, "usage_recorder", recorder)
+    return recorder
+
+
+class TestUsageLimitMiddleware:
+    """Usage limit middleware tests"""
+
+    def test_successful_search_records_usage(self, fake_firestore, recorder, auth_headers):
+        """Test a successful search is checked and recorded once"""
+        with TestClient(create_test_app(recorder)) as test_client:
+            response = test_client.post("/api/v1/ai/extract-keywords", headers=auth_headers)
+            assert response.status_code == 200
+
+        # Lifespan kapanışında kuyruk boşaltılır
+        fake_firestore.check_user_search_limit.assert_awaited_once_with("test-user-123")
+        fake_firestore.increment_user_search_usage.assert_awaited_once_with("test-user-123")
+
+    def test_over_limit_user_gets_429(self, fake_firestore, recorder, auth_headers):
+        """Test a user over the limit is rejected without recording usage"""
+        fake_firestore.check_user_search_limit.return_value = LIMIT_REACHED
+
+        with TestClient(create_test_app(recorder)) as test_client:
+            response = test_client.post("/api/v1/ai/extract-keywords", headers=auth_headers)
+            assert response.status_code == 429
+
+        fake_firestore.increment_user_search_usage.assert_not_awaited()
+
+    def test_recorder_survives_second_lifespan(self, fake_firestore, recorder, auth_headers):
+        """Test the recorder keeps working when the app is started twice"""
+        for _ in range(2):
+            with TestClient(create_test_app(recorder)) as test_client:
+                response = test_client.post("/api/v1/ai/extract-keywords", headers=auth_headers)
+                assert response.status_code == 200
+
+        assert fake_firestore.increment_user_search_usage.await_args_list == [call("test-user-123")] * 2
+
+    def test_skipped_path_is_not_checked(self, fake_firestore, recorder, auth_headers):
+        """Test skipped paths bypass the limit check even with a token"""
+        fake_firestore.check_user_search_limit.return_value = LIMIT_REACHED
+
+        with TestClient(create_test_app(recorder)) as test_client:
+            response = test_client.get("/health", headers=auth_headers)
+            assert response.status_code == 200
+
+        fake_firestore.check_user_search_limit.assert_not_awaited()
+        fake_firestore.increment_user_search_usage.assert_not_awaited()
+
+    def test_unauthenticated_request_passes_through(self, fake_firestore, recorder):
+        """Test requests without a token are left to the endpoint"""
+        with TestClient(create_test_app(recorder)) as test_client:
+            response = test_client.post("/api/v1/ai/extract-keywords")
+            assert response.status_code == 200
+
+        fake_firestore.check_user_search_limit.assert_not_awaited()
+        fake_firestore.increment_user_search_usage.assert_not_awaited()
+
+    def test_limit_exceeded_payload(self, fake_firestore, recorder, auth_headers):
+        """Test the 429 response body"""
+        fake_firestore.check_user_search_limit.return_value = LIMIT_REACHED
+
+        with TestClient(create_test_app(recorder)) as test_client:
+            response = test_client.post("/api/v1/ai/extract-keywords", headers=auth_headers)
+
+        assert response.status_code == 429
+        assert response.json() == {
+            "detail": "Arama limiti aşıldı: Trial search limit reached",
+            "error_code": "USAGE_LIMIT_EXCEEDED",
+            "reason": "Trial search limit reached"
+        }
@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     MAX_PAGES_TO_SEARCH: int = 5
     TARGET_RESULTS_PER_KEYWORD: int = 3
     SELENIUM_GRID_URL: str = "http://selenium-hub:4444/wd/hub"
+    MAX_WORKERS: int = 10  # Eşzamanlı Selenium araması sayısı
+    CACHE_MAX_ENTRIES: int = 100
+    CACHE_TTL: int = 3600  # Saniye
+    NO_RESULTS_CACHE_TTL: int = 300  # Sonuçsuz aramalar için saniye
 
 # Ayarları import edilebilir bir nesne olarak oluştur
 settings = Settings()
\ No newline at end of file
@@ -4,10 +4,12 @@ import sys
 import time
 import asyncio
 import concurrent.futures
-import hashlib
+import orjson
 
-from fastapi import FastAPI, HTTPException, Request
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from loguru import logger
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -28,13 +30,30 @@ logger.add(sys.stdout, format="{time} {level} {message}", level=settings.LOG_LEV
 # --- Rate Limiter ---
 limiter = Limiter(key_func=get_remote_address)
 
-# --- In-memory cache for search results ---
-search_cache = {}
+# --- In-memory cache for search results (boyutu ve ömrü sınırlı) ---
+search_cache = TTLCache(maxsize=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL)
+# Sonuçsuz aramalar daha kısa süre tutulur; aynı sorgu tekrar tekrar scrape edilmez
+empty_search_cache = TTLCache(maxsize=settings.CACHE_MAX_ENTRIES, ttl=settings.NO_RESULTS_CACHE_TTL)
 search_stats = {"total_searches": 0, "total_results": 0}
+# Devam eden aramalar (cache_key -> yanıt byte'ları); aynı sorgu tekrar scrape edilmez
+inflight_searches = {}
+
+# --- Selenium aramaları için paylaşımlı thread pool (istek başına oluşturulmaz) ---
+def create_search_executor():
+    """Arama thread pool'unu oluşturur (thread'ler ilk aramada başlatılır)"""
+    return concurrent.futures.ThreadPoolExecutor(
+        max_workers=settings.MAX_WORKERS,
+        thread_name_prefix="yargitay-search"
+    )
+
+search_executor = create_search_executor()
 
 # --- Uygulama Yaşam Döngüsü ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global search_executor
+    # Her lifespan kendi havuzunu kullanır; önceki kapanışta shutdown edilen havuz tekrar kullanılmaz
+    search_executor = create_search_executor()
     logger.info("Yargıtay Scraper API başlatıldı")
     
     # MongoDB Atlas bağlantısını başlat (hata durumunda fallback)
@@ -56,6 +75,9 @@ async def lifespan(app: FastAPI):
         logger.info("MongoDB bağlantısı kapatıldı")
     except Exception as e:
         logger.warning(f"Database kapatma hatası: {e}")
+    
+    # Bekleyen arama görevlerini iptal et, çalışanların bitmesini bekleme
+    search_executor.shutdown(wait=False, cancel_futures=True)
     logger.info("Yargıtay Scraper API kapatıldı")
 
 # --- FastAPI Uygulaması ---
@@ -63,17 +85,26 @@ app = FastAPI(
     title="Yargıtay Scraper API",
     description="Yargıtay Karar Arama Servisi (MongoDB Atlas)",
     version="2.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
 # --- Helper Functions ---
-def generate_cache_key(keywords):
-    """Anahtar kelimelerden cache key oluşturur"""
-    keywords_str = ",".join(sorted(keywords))
-    return hashlib.md5(keywords_str.encode()).hexdigest()
+def to_api_result(result: schemas.ResultItem) -> dict:
+    """ResultItem'ı API uyumluluğu için ek alanlarla dict'e çevirir"""
+    result_dict = result.model_dump()
+    result_dict.update({
+        "case_number": result.esas_no,
+        "title": f"{result.daire} - {result.karar_no}",
+        "content": result.karar_metni,
+        "date": result.karar_tarihi,
+        "court": result.daire,
+        "url": f"https://karararama.yargitay.gov.tr/YargitayBilgiBankasiIstemciWeb/#{result.esas_no}"
+    })
+    return result_dict
 
 # --- API Endpoints ---
 
@@ -96,6 +127,7 @@ async def root():
         "endpoints": {
             "health": "/health",
             "search": "/search",
+            "search_stream": "/search/stream",
             "docs": "/docs"
         }
     }
@@ -107,61 +139,83 @@ async def search_yargitay_parallel(
     search_request: schemas.SearchRequest
 ):
     """Anahtar kelimelerle Yargıtay'da paralel arama yapar."""
+    # Geçersiz istekler cache key hesaplanmadan reddedilir
+    if not search_request.keywords:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="En az bir anahtar kelime gereklidir"
+        )
+    
     logger.info(f"Arama başlatıldı: {len(search_request.keywords)} anahtar kelime")
     start_time = time.time()
     
     # Cache kontrolü
-    cache_key = generate_cache_key(search_request.keywords)
-    if cache_key in search_cache:
-        cached_result = search_cache[cache_key]
-        logger.info(f"Cache'den sonuç döndürüldü: {len(cached_result['results'])} sonuç")
-        return schemas.SearchResponse(**cached_result)
+    # Tuple doğrudan dict/TTLCache anahtarı olur; ayrıca hash hesaplamaya gerek yok
+    cache_key = (tuple(sorted(search_request.keywords)), search_request.max_results)
+    cached_payload = search_cache.get(cache_key) or empty_search_cache.get(cache_key)
+    if cached_payload is not None:
+        logger.info(f"Cache'den sonuç döndürüldü: {len(cached_payload)} byte")
+        return Response(content=cached_payload, media_type="application/json")
+    
+    # Aynı arama zaten sürüyorsa onun sonucu beklenir.
+    # shield: bekleyen istemci iptal edilse de asıl arama etkilenmez.
+    inflight = inflight_searches.get(cache_key)
+    while inflight is not None:
+        logger.info("Aynı arama zaten sürüyor, sonucu bekleniyor")
+        try:
+            payload = await asyncio.shield(inflight)
+            return Response(content=payload, media_type="application/json")
+        except asyncio.CancelledError:
+            # Bu istek iptal edildiyse iptali ilet; yalnızca beklenen arama iptal edildiyse
+            # arama burada yeniden yapılır
+            if not inflight.cancelled() or asyncio.current_task().cancelling():
+                raise
+            logger.info("Beklenen arama iptal edildi, arama yeniden başlatılıyor")
+        inflight = inflight_searches.get(cache_key)
+    
+    loop = asyncio.get_running_loop()
+    inflight = loop.create_future()
+    inflight_searches[cache_key] = inflight
     
-    max_workers = min(len(search_request.keywords), 10)
     all_results = []
     search_details = {}
 
     try:
-        loop = asyncio.get_event_loop()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = [
-                loop.run_in_executor(executor, search_single_keyword, keyword, idx)
+        outcomes = await asyncio.gather(
+            *(
+                loop.run_in_executor(search_executor, search_single_keyword, keyword, idx)
                 for idx, keyword in enumerate(search_request.keywords)
-            ]
-            for future in asyncio.as_completed(futures):
-                keyword, results, success, message = await future
-                all_results.extend(results)
-                search_details[keyword] = {
-                    "success": success, 
-                    "count": len(results), 
-                    "message": message
-                }
-
-        # Sonuçları unique hale getir (aynı case_number'a sahip olanları birleştir)
+            ),
+            return_exceptions=True
+        )
+        for keyword, outcome in zip(search_request.keywords, outcomes):
+            if isinstance(outcome, Exception):
+                search_details[keyword] = {"success": False, "count": 0, "message": str(outcome)}
+                continue
+            keyword, results, success, message = outcome
+            all_results.extend(results)
+            search_details[keyword] = {
+                "success": success, 
+                "count": len(results), 
+                "message": message
+            }
+
+        # Sonuçları unique hale getir (aynı esas numarasına sahip olanlardan ilki kalır).
+        # Tekrar eden sonuçlar dict'e çevrilmeden atlanır.
         unique_results = {}
         for result in all_results:
-            # ResultItem objesi ise dict'e çevir
-            if hasattr(result, 'model_dump'):
-                result_dict = result.model_dump()
-            elif hasattr(result, 'dict'):
-                result_dict = result.dict()
-            else:
-                result_dict = result
+            esas_no = result.esas_no
+            if esas_no in unique_results:
+                continue
             
-            case_number = result_dict.get("case_number", result_dict.get("esas_no", "unknown"))
-            if case_number not in unique_results:
-                # API uyumluluğu için ek alanlar ekle
-                result_dict.update({
-                    "case_number": result_dict.get("esas_no", ""),
-                    "title": f"{result_dict.get('daire', '')} - {result_dict.get('karar_no', '')}",
-                    "content": result_dict.get("karar_metni", ""),
-                    "date": result_dict.get("karar_tarihi", ""),
-                    "court": result_dict.get("daire", ""),
-                    "url": f"https://karararama.yargitay.gov.tr/YargitayBilgiBankasiIstemciWeb/#{result_dict.get('esas_no', '')}"
-                })
-                unique_results[case_number] = result_dict
+            unique_results[esas_no] = to_api_result(result)
         
         final_results = list(unique_results.values())
+        unique_count = len(final_results)
+        
+        # İstemcinin istediğinden fazlasını gönderme (response boyutu max_results ile sınırlı kalsın)
+        if search_request.max_results:
+            final_results = final_results[:search_request.max_results]
         
         # İstatistikleri güncelle
         search_stats["total_searches"] += 1
@@ -173,22 +227,34 @@ async def search_yargitay_parallel(
         response_data = {
             "results": final_results,
             "success": True,
-            "message": f"Paralel arama {elapsed_time:.2f} saniyede tamamlandı. {len(final_results)} unique sonuç bulundu.",
+            "message": f"Paralel arama {elapsed_time:.2f} saniyede tamamlandı. {unique_count} unique sonuç bulundu.",
             "search_details": search_details,
             "processing_time": elapsed_time,
             "total_keywords": len(search_request.keywords),
-            "unique_results": len(final_results)
+            "unique_results": unique_count
         }
         
-        # Cache'e kaydet (en fazla 100 arama sonucu cache'de tutalım)
-        if len(search_cache) < 100:
-            search_cache[cache_key] = response_data
+        # Yanıt bir kez doğrulanıp serileştirilir; aynı byte'lar hem cache'e yazılır hem döndürülür.
+        # Response döndürmek FastAPI'nin response_model ile ikinci kez doğrulamasını atlar.
+        payload = orjson.dumps(schemas.SearchResponse(**response_data).model_dump())
+        
+        # Cache'e kaydet (TTLCache doluysa en eski kayıt düşer).
+        # search_single_keyword hatada exception atmaz, success=False döner; kısmi ya da
+        # tamamen başarısız aramalar cache'lenmez, aksi halde kesinti "sonuç yok" diye sunulur.
+        if not all(detail["success"] for detail in search_details.values()):
+            logger.warning("Başarısız anahtar kelime araması var, sonuç cache'lenmedi")
+        elif final_results:
+            search_cache[cache_key] = payload
+        else:
+            empty_search_cache[cache_key] = payload
         
-        return schemas.SearchResponse(**response_data)
+        inflight.set_result(payload)
+        return Response(content=payload, media_type="application/json")
         
     except Exception as e:
         logger.error(f"Arama hatası: {str(e)}")
-        return schemas.SearchResponse(
+        # Hata yanıtı cache'e yazılmaz, ama bekleyen aynı istekler de bunu alır
+        payload = orjson.dumps(schemas.SearchResponse(
             results=[],
             success=False,
             message=f"Arama sırasında hata oluştu: {str(e)}",
@@ -196,14 +262,92 @@ async def search_yargitay_parallel(
             processing_time=time.time() - start_time,
             total_keywords=len(search_request.keywords),
             unique_results=0
+        ).model_dump())
+        inflight.set_result(payload)
+        return Response(content=payload, media_type="application/json")
+    finally:
+        inflight_searches.pop(cache_key, None)
+        # İstek iptal edildiyse bekleyenler de serbest bırakılır
+        if not inflight.done():
+            inflight.cancel()
+
+@app.post("/search/stream", tags=["Search"])
+@limiter.limit(settings.USER_RATE_LIMIT)
+async def search_yargitay_stream(
+    request: Request,
+    search_request: schemas.SearchRequest
+):
+    """Anahtar kelime sonuçlarını tamamlandıkça Server-Sent Events olarak gönderir."""
+    if not search_request.keywords:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="En az bir anahtar kelime gereklidir"
         )
+    
+    logger.info(f"Stream arama başlatıldı: {len(search_request.keywords)} anahtar kelime")
+    loop = asyncio.get_running_loop()
+    
+    async def run_keyword(keyword, idx):
+        try:
+            return await loop.run_in_executor(search_executor, search_single_keyword, keyword, idx)
+        except Exception as e:
+            return (keyword, [], False, str(e))
+    
+    async def event_stream():
+        start_time = time.time()
+        seen_cases = set()
+        sent_count = 0
+        # Görevler stream başladığında oluşturulur; istemci ilk chunk'tan önce koparsa
+        # generator hiç çalışmaz ve arka planda sahipsiz arama kalmaz
+        tasks = [
+            asyncio.ensure_future(run_keyword(keyword, idx))
+            for idx, keyword in enumerate(search_request.keywords)
+        ]
+        
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                keyword, results, success, message = await next_result
+                
+                # Önceki event'lerde gönderilen kararları tekrar gönderme
+                keyword_results = []
+                for result in results:
+                    if result.esas_no in seen_cases:
+                        continue
+                    seen_cases.add(result.esas_no)
+                    keyword_results.append(to_api_result(result))
+                
+                if search_request.max_results:
+                    keyword_results = keyword_results[:search_request.max_results - sent_count]
+                sent_count += len(keyword_results)
+                
+                event = {"keyword": keyword, "success": success, "message": message, "results": keyword_results}
+                yield f"data: {orjson.dumps(event).decode()}\n\n"
+                
+                if search_request.max_results and sent_count >= search_request.max_results:
+                    break
+            
+            search_stats["total_searches"] += 1
+            search_stats["total_results"] += sent_count
+            
+            summary = {"unique_results": sent_count, "processing_time": time.time() - start_time}
+            yield f"event: done\ndata: {orjson.dumps(summary).decode()}\n\n"
+        finally:
+            # İstemci bağlantıyı kapattıysa veya limit dolduysa kalan aramaları iptal et
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/stats", tags=["Statistics"])
 async def get_stats():
     """API istatistiklerini döndürür"""
     return {
         "search_stats": search_stats,
-        "cache_size": len(search_cache),
+        "cache_size": search_cache.currsize,
+        "cache_max_size": search_cache.maxsize,
+        "cache_ttl_seconds": search_cache.ttl,
+        "empty_cache_size": empty_search_cache.currsize,
+        "empty_cache_ttl_seconds": empty_search_cache.ttl,
         "service_info": {
             "name": "Yargıtay Scraper API",
             "version": "2.0.0",
@@ -215,9 +359,9 @@ async def get_stats():
 @app.delete("/cache", tags=["Cache"])
 async def clear_cache():
     """Cache'i temizler"""
-    global search_cache
-    cache_size = len(search_cache)
+    cache_size = len(search_cache) + len(empty_search_cache)
     search_cache.clear()
+    empty_search_cache.clear()
     logger.info(f"Cache temizlendi: {cache_size} kayıt silindi")
     return {
         "message": f"Cache başarıyla temizlendi",
@@ -1,6 +1,6 @@
 # /yargitay-scraper-api/app/schemas.py (MongoDB'siz)
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 
 # --- Arama Şemaları ---
@@ -20,7 +20,8 @@ class ResultItem(BaseModel):
 
 class SearchRequest(BaseModel):
     keywords: List[str]
-    max_results: Optional[int] = 50
+    # Negatif değerler slicing ile sondan kırpardı; None sınırsız demektir
+    max_results: Optional[int] = Field(50, ge=1)
 
 class SearchResponse(BaseModel):
     results: List[ResultItem]
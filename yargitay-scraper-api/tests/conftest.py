@@ -0,0 +1,22 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from app import main
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def clear_search_cache():
+    """Her test boş cache ile başlar"""
+    main.search_cache.clear()
+    main.empty_search_cache.clear()
+    yield
+    main.search_cache.clear()
+    main.empty_search_cache.clear()
+
+
+@pytest_asyncio.fixture
+async def async_client():
+    """Async test client"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import main
+from app.schemas import ResultItem
+
+
+class FakeScraper:
+    """search_single_keyword yerine geçen, çağrıları sayan yavaş arama"""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, keyword, thread_id):
+        with self._lock:
+            self.calls.append(keyword)
+        time.sleep(self.delay)
+        result = ResultItem(
+            daire="1. Hukuk Dairesi",
+            esas_no=f"2023/{keyword}",
+            karar_no="2024/1",
+            karar_tarihi="01.01.2024",
+            karar_metni="Karar metni",
+            keyword=keyword
+        )
+        return keyword, [result], True, "ok"
+
+
+@pytest.fixture
+def fake_scraper(monkeypatch):
+    scraper = FakeScraper()
+    monkeypatch.setattr(main, "search_single_keyword", scraper)
+    return scraper
+
+
+class TestSearch:
+    """Search endpoint tests"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_searches_scrape_once(self, async_client, fake_scraper):
+        """Test identical in-flight searches share one scrape per keyword"""
+        body = {"keywords": ["tazminat", "kira"], "max_results": 10}
+
+        responses = await asyncio.gather(
+            async_client.post("/search", json=body),
+            async_client.post("/search", json=body)
+        )
+
+        assert [response.status_code for response in responses] == [200, 200]
+        assert responses[0].content == responses[1].content
+        assert sorted(fake_scraper.calls) == ["kira", "tazminat"]